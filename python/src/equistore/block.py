@@ -47,6 +47,7 @@ class TensorBlock:
         """
         self._lib = _get_library()
         self._parent = None
+        self._cached_flat_values = None
 
         components_array = ctypes.ARRAY(eqs_labels_t, len(components))()
         for i, component in enumerate(components):
@@ -73,6 +74,7 @@ class TensorBlock:
         obj = TensorBlock.__new__(TensorBlock)
         obj._lib = _get_library()
         obj._actual_ptr = ptr
+        obj._cached_flat_values = None
         # keep a reference to the parent object (usually a TensorMap) to
         # prevent it from beeing garbage-collected & removing this block
         obj._parent = parent
@@ -157,6 +159,25 @@ class TensorBlock:
         raw_array = _get_raw_array(self._lib, self._ptr, "values")
         return eqs_array_to_python_array(raw_array, parent=self)
 
+    @property
+    def flat_values(self) -> Array:
+        """
+        Access the values for this block as a 2D array, with the components
+        merged into the samples.
+
+        The view is built (and cached) on first access; the data buffer is
+        shared with :py:attr:`TensorBlock.values`.
+        """
+        if self._cached_flat_values is None:
+            values = self.values
+            self._cached_flat_values = values.reshape(-1, values.shape[-1])
+        return self._cached_flat_values
+
+    @property
+    def n_properties(self) -> int:
+        """Number of properties (last dimension of the values) in this block"""
+        return self.flat_values.shape[-1]
+
     @property
     def samples(self) -> Labels:
         """
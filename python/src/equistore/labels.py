@@ -130,6 +130,14 @@ class Labels(np.ndarray):
         # would break `position` and `__contains__`
         self._eqs_labels_t = None
 
+        # the cached hash of the values, the position index, the raw 2D view
+        # and the eqs_labels_t view are tied to a specific array, do not
+        # propagate them to views
+        self._cached_values_hash = None
+        self._cached_position_index = None
+        self._cached_asarray = None
+        self._cached_eqs_labels_view = None
+
         self._lib = getattr(obj, "_lib", None)
 
     def __del__(self):
@@ -145,6 +153,17 @@ class Labels(np.ndarray):
         """Names of the columns/dimensions used for these labels"""
         return self.dtype.names or []
 
+    @property
+    def _values_hash(self) -> int:
+        """
+        Lazily computed hash of the raw values of these labels, allowing to
+        short-circuit full elementwise comparisons between labels: two labels
+        with different hashes are guaranteed to contain different values.
+        """
+        if self._cached_values_hash is None:
+            self._cached_values_hash = hash(self.tobytes())
+        return self._cached_values_hash
+
     @staticmethod
     def single() -> "Labels":
         """
@@ -191,7 +210,9 @@ class Labels(np.ndarray):
     def _as_eqs_labels_t(self):
         """transform these labels into eqs_labels_t"""
         if self._eqs_labels_t is None:
-            return _eqs_labels_view(self)
+            if self._cached_eqs_labels_view is None:
+                self._cached_eqs_labels_view = _eqs_labels_view(self)
+            return self._cached_eqs_labels_view
         else:
             return self._eqs_labels_t
 
@@ -217,41 +238,67 @@ class Labels(np.ndarray):
                 values=np.empty(shape=(0, len(names)), dtype=np.int32),
             )
 
-    def position(self, label) -> Optional[int]:
+    @property
+    def _position_index(self) -> dict:
+        """
+        Lazily built index from packed label entry to its position in these
+        labels, making ``position`` and ``__contains__`` O(1) dictionary
+        lookups instead of a linear search over the entries.
         """
-        Get the position of the given ``label`` entry in this set of labels.
+        if self._cached_position_index is None:
+            values = self.asarray()
+            if 1 <= values.shape[1] <= 2:
+                entries = _pack_rows(values).tolist()
+            else:
+                entries = [tuple(row) for row in values.tolist()]
+            self._cached_position_index = {entry: i for i, entry in enumerate(entries)}
+        return self._cached_position_index
 
-        This is only available if the labels comes from a
-        :py:class:`TensorBlock` or a :py:class:`TensorMap`. If you need it for
-        standalone labels, please let us know!
+    def position(self, label) -> Optional[int]:
         """
-        lib = _get_library()
-
-        result = ctypes.c_int64()
-        values = ctypes.ARRAY(ctypes.c_int32, len(label))()
-        for i, v in enumerate(label):
-            values[i] = ctypes.c_int32(v)
-
-        lib.eqs_labels_position(
-            self._eqs_labels_t,
-            values,
-            len(label),
-            result,
-        )
+        Get the position of the given ``label`` entry in this set of labels,
+        or ``None`` if this entry is not part of these labels.
+        """
+        label = tuple(label)
+        if len(label) != len(self.names):
+            return None
 
-        if result.value >= 0:
-            return result.value
+        if 1 <= len(label) <= 2:
+            entry = _pack_entry(label)
         else:
-            return None
+            entry = tuple(int(v) for v in label)
+
+        return self._position_index.get(entry)
 
     def asarray(self):
         """Get a view of these ``Labels`` as a raw 2D array of integers"""
-        return self.view(dtype=np.int32).reshape(self.shape[0], -1)
+        if self._cached_asarray is None:
+            self._cached_asarray = self.view(dtype=np.int32).reshape(self.shape[0], -1)
+        return self._cached_asarray
 
     def __contains__(self, label):
         return self.position(label) is not None
 
 
+def _pack_rows(values: np.ndarray) -> np.ndarray:
+    """Pack the columns of a 2D int32 array (up to two of them) into a single
+    int64 per row, so that rows can be hashed and compared as plain integers"""
+    if values.shape[1] == 1:
+        return values[:, 0].astype(np.int64)
+
+    high = values[:, 0].astype(np.int64) << 32
+    low = values[:, 1].astype(np.int64) & 0xFFFFFFFF
+    return high | low
+
+
+def _pack_entry(label) -> int:
+    """Pack a single label entry the same way as :py:func:`_pack_rows`"""
+    if len(label) == 1:
+        return int(label[0])
+
+    return (int(label[0]) << 32) | (int(label[1]) & 0xFFFFFFFF)
+
+
 def _eqs_labels_view(array):
     """Create a new eqs_label_t where the values are a view inside the array"""
     labels = eqs_labels_t()
@@ -270,6 +317,10 @@ def _eqs_labels_view(array):
     labels.values = ptr
     labels.count = array.shape[0]
 
+    # keep the (possibly newly allocated) contiguous array alive for as long
+    # as the view into it exists
+    labels._values_ref = contiguous
+
     return labels
 
 
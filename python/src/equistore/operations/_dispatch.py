@@ -1,3 +1,5 @@
+import functools
+
 import numpy as np
 
 
@@ -10,6 +12,14 @@ except ImportError:
         pass
 
 
+try:
+    import scipy.linalg
+
+    HAS_SCIPY = True
+except ImportError:
+    HAS_SCIPY = False
+
+
 UNKNOWN_ARRAY_TYPE = (
     "unknown array type, only numpy arrays and torch tensors are supported"
 )
@@ -112,6 +122,36 @@ def dot(A, B):
         raise TypeError(UNKNOWN_ARRAY_TYPE)
 
 
+# matrices larger than this many bytes are factorized without going through
+# the LU cache: building the cache key copies and hashes the whole matrix
+# even on cache hits, and the LRU would pin both the raw bytes and the
+# factors in memory for the lifetime of the process
+_LU_CACHE_MAX_NBYTES = 4 * 1024 * 1024
+
+
+def _lu_factor(X):
+    """LU-factorize a square matrix with LAPACK ``getrf``."""
+    getrf = scipy.linalg.get_lapack_funcs("getrf", (X,))
+    lu, piv, info = getrf(X)
+    if info > 0:
+        # matches the np.linalg.solve behavior on singular systems
+        raise np.linalg.LinAlgError("Singular matrix")
+    elif info < 0:
+        raise ValueError(f"invalid input to LAPACK getrf (argument {-info})")
+    return lu, piv
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_lu_factor(shape, dtype, data):
+    """
+    LU-factorize the square matrix stored in the ``data`` bytes, keeping the
+    factorizations of recently seen matrices around. When the same matrix is
+    solved against multiple right hand sides, only the first call pays for the
+    O(n^3) factorization, the other ones reuse it through ``lu_solve``.
+    """
+    return _lu_factor(np.frombuffer(data, dtype=dtype).reshape(shape))
+
+
 def solve(X, Y):
     """
     Computes the solution of a square system of linear equations with a unique
@@ -121,6 +161,39 @@ def solve(X, Y):
     """
     if isinstance(X, np.ndarray):
         _check_all_same_type([Y], np.ndarray)
+
+        # closed-form kernels for the smallest systems: at these sizes the
+        # LAPACK dispatch overhead costs more than the arithmetic itself, and
+        # the expressions below vectorize over stacked batches. Singular
+        # systems fall through to LAPACK to raise the usual LinAlgError, and
+        # non-square inputs skip the kernels so they get the same error as
+        # with np.linalg.solve
+        n = X.shape[-1] if X.shape[-2] == X.shape[-1] else 0
+        if n == 1:
+            if np.all(X != 0):
+                return Y / X
+        elif n == 2:
+            det = X[..., 0, 0] * X[..., 1, 1] - X[..., 0, 1] * X[..., 1, 0]
+            if np.all(det != 0):
+                inverse_det = 1.0 / np.asarray(det)[..., None]
+                w_0 = X[..., 1, 1][..., None] * Y[..., 0, :]
+                w_0 -= X[..., 0, 1][..., None] * Y[..., 1, :]
+                w_1 = X[..., 0, 0][..., None] * Y[..., 1, :]
+                w_1 -= X[..., 1, 0][..., None] * Y[..., 0, :]
+                return np.stack([w_0 * inverse_det, w_1 * inverse_det], axis=-2)
+
+        if HAS_SCIPY and X.ndim == 2 and n != 0 and X.dtype.char in "fd":
+            # call the LAPACK routines directly, skipping the Python-level
+            # coercion and checks of the high-level wrappers
+            if X.nbytes <= _LU_CACHE_MAX_NBYTES:
+                lu, piv = _cached_lu_factor(X.shape, X.dtype.str, X.tobytes())
+            else:
+                lu, piv = _lu_factor(X)
+            getrs = scipy.linalg.get_lapack_funcs("getrs", (lu,))
+            weights, info = getrs(lu, piv, Y)
+            if info != 0:
+                raise ValueError(f"invalid input to LAPACK getrs (argument {-info})")
+            return weights
         return np.linalg.solve(X, Y)
     elif isinstance(X, TorchTensor):
         _check_all_same_type([Y], TorchTensor)
@@ -130,6 +203,57 @@ def solve(X, Y):
         raise TypeError(UNKNOWN_ARRAY_TYPE)
 
 
+def contiguous(array):
+    """Return a C-contiguous version of the given array.
+
+    This only copies the data when the array is not already C-contiguous,
+    like ``np.ascontiguousarray(array)`` / ``torch.Tensor.contiguous()``.
+    """
+    if isinstance(array, np.ndarray):
+        return np.ascontiguousarray(array)
+    elif isinstance(array, TorchTensor):
+        return array.contiguous()
+    else:
+        raise TypeError(UNKNOWN_ARRAY_TYPE)
+
+
+def cholesky_solve(X, Y):
+    """
+    Solve the over-determined system ``X @ w = Y`` (more rows than columns in
+    ``X``) through the normal equations ``(X.T @ X) @ w = X.T @ Y``.
+
+    On the numpy backend with scipy available, the symmetric positive definite
+    ``X.T @ X`` is built with SYRK and solved with a Cholesky factorization,
+    which is about twice as fast as a general factorization; everything falls
+    back to a plain solve of the normal equations otherwise.
+    """
+    if isinstance(X, np.ndarray):
+        _check_all_same_type([Y], np.ndarray)
+        XtY = X.T @ Y
+        if HAS_SCIPY and X.dtype == np.float64:
+            # SYRK only computes the upper triangle of X.T @ X, which is all
+            # the Cholesky factorization below needs
+            XtX = scipy.linalg.blas.dsyrk(1.0, X, trans=1)
+            try:
+                factor = scipy.linalg.cho_factor(
+                    XtX, lower=False, overwrite_a=True, check_finite=False
+                )
+                return scipy.linalg.cho_solve(
+                    factor, XtY, overwrite_b=True, check_finite=False
+                )
+            except np.linalg.LinAlgError:
+                # XtX is not numerically positive definite, use the
+                # general solver below
+                pass
+
+        return np.linalg.solve(X.T @ X, XtY)
+    elif isinstance(X, TorchTensor):
+        _check_all_same_type([Y], TorchTensor)
+        return torch.linalg.solve(X.T @ X, X.T @ Y)
+    else:
+        raise TypeError(UNKNOWN_ARRAY_TYPE)
+
+
 def sqrt(array):
     """Compute the square root  of the input array.
 
@@ -207,6 +331,21 @@ def hstack(arrays):
         raise TypeError(UNKNOWN_ARRAY_TYPE)
 
 
+def stack(arrays):
+    """Stack a group of arrays along a new leading axis.
+
+    This function has the same behavior as ``numpy.stack(arrays, axis=0)``.
+    """
+    if isinstance(arrays[0], np.ndarray):
+        _check_all_same_type(arrays, np.ndarray)
+        return np.stack(arrays, axis=0)
+    elif isinstance(arrays[0], TorchTensor):
+        _check_all_same_type(arrays, TorchTensor)
+        return torch.stack(arrays, dim=0)
+    else:
+        raise TypeError(UNKNOWN_ARRAY_TYPE)
+
+
 def vstack(arrays):
     """Stack vertically a group of arrays.
 
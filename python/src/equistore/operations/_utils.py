@@ -1,3 +1,4 @@
+import weakref
 from typing import List
 
 import numpy as np
@@ -7,6 +8,22 @@ from ..labels import Labels
 from ..tensor import TensorMap
 
 
+# pairs of TensorMap that already passed `_check_maps`, keyed by their object
+# ids. The keys of a TensorMap can not change after construction, so a pair
+# only needs to be validated once; weak references evict an entry as soon as
+# either map is garbage collected, preventing stale hits from recycled ids
+_CHECKED_MAPS = {}
+
+
+def _remember_checked_maps(a: TensorMap, b: TensorMap):
+    key = (id(a), id(b))
+
+    def _evict(_, key=key):
+        _CHECKED_MAPS.pop(key, None)
+
+    _CHECKED_MAPS[key] = (weakref.ref(a, _evict), weakref.ref(b, _evict))
+
+
 def _check_maps(a: TensorMap, b: TensorMap, fname: str):
     """Check if metadata between two TensorMaps is consistent for an operation.
 
@@ -16,9 +33,14 @@ def _check_maps(a: TensorMap, b: TensorMap, fname: str):
     2. The number of blocks in the same
     3. The block key indices are the same.
 
+    Pairs of maps that already passed this check (including a map checked
+    against itself) are accepted immediately.
+
     :param a: first :py:class:`TensorMap` for check
     :param b: second :py:class:`TensorMap` for check
     """
+    if a is b or (id(a), id(b)) in _CHECKED_MAPS:
+        return
 
     if a.keys.names != b.keys.names:
         raise ValueError(
@@ -35,6 +57,8 @@ def _check_maps(a: TensorMap, b: TensorMap, fname: str):
     if not np.all([key in a.keys for key in b.keys]):
         raise ValueError(f"Inputs to {fname} should have the same key indices.")
 
+    _remember_checked_maps(a, b)
+
 
 def _check_blocks(a: TensorBlock, b: TensorBlock, props: List[str], fname: str):
     """Check if metadata between two TensorBlocks is consistent for an operation.
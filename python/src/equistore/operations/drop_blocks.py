@@ -2,6 +2,8 @@ import numpy as np
 
 from equistore import Labels, TensorMap
 
+from ..labels import _pack_rows
+
 
 def drop_blocks(tensor: TensorMap, keys: Labels) -> TensorMap:
     """
@@ -19,12 +21,28 @@ def drop_blocks(tensor: TensorMap, keys: Labels) -> TensorMap:
             "The input tensor's keys must have the same names as the specified"
             f" keys to drop. Should be {tensor.keys.names} but got {keys.names}"
         )
-    diff = np.setdiff1d(keys, tensor.keys)
+    diff = keys[~_keys_in(keys, tensor.keys)]
     if len(diff) > 0:
         raise ValueError(
             "some keys in `keys` are not present in `tensor`."
             f" Non-existent keys: {diff}"
         )
-    new_keys = np.setdiff1d(tensor.keys, keys)
+    new_keys = tensor.keys[~_keys_in(tensor.keys, keys)]
     new_blocks = [tensor[key].copy() for key in new_keys]
     return TensorMap(keys=new_keys, blocks=new_blocks)
+
+
+def _keys_in(keys: Labels, other: Labels) -> np.ndarray:
+    """
+    Vectorized row membership test: return a boolean mask with one entry per
+    key in ``keys``, true when this key is also present in ``other``.
+
+    Keys with at most two dimensions are packed into a single int64 per row,
+    so the search runs on plain integers instead of going through numpy's
+    slower structured-array comparisons.
+    """
+    n_dimensions = len(keys.names)
+    if 1 <= n_dimensions <= 2:
+        return np.isin(_pack_rows(keys.asarray()), _pack_rows(other.asarray()))
+
+    return np.isin(keys, other)
@@ -69,22 +69,36 @@ def _lstsq_block(X: TensorBlock, Y: TensorBlock, rcond, driver) -> TensorBlock:
                     in the same order"
                 )
 
-    # reshape components together with the samples
-    X_n_properties = X.values.shape[-1]
-    X_values = X.values.reshape(-1, X_n_properties)
+    # 2D views with the components reshaped together with the samples, cached
+    # on the blocks
+    X_n_properties = X.n_properties
+    X_values = X.flat_values
 
-    Y_n_properties = Y.values.shape[-1]
-    Y_values = Y.values.reshape(-1, Y_n_properties)
+    Y_n_properties = Y.n_properties
+    Y_values = Y.flat_values
 
     _check_same_gradients(X, Y, props=None, fname="lstsq")
 
-    for parameter, X_gradient in X.gradients():
-        X_gradient_data = X_gradient.data.reshape(-1, X_n_properties)
-        X_values = _dispatch.vstack((X_values, X_gradient_data))
-
-        Y_gradient = Y.gradient(parameter)
-        Y_gradient_data = Y_gradient.data.reshape(-1, Y_n_properties)
-        Y_values = _dispatch.vstack((Y_values, Y_gradient_data))
+    if isinstance(X_values, np.ndarray) and len(X.gradients_list()) != 0:
+        # collect 2D views of every gradient and concatenate them below the
+        # values in a single pass, instead of one re-allocating vstack per
+        # gradient parameter
+        X_parts = [X_values]
+        Y_parts = [Y_values]
+        for parameter, X_gradient in X.gradients():
+            X_parts.append(X_gradient.data.reshape(-1, X_n_properties))
+            Y_parts.append(Y.gradient(parameter).data.reshape(-1, Y_n_properties))
+
+        X_values = np.concatenate(X_parts, axis=0)
+        Y_values = np.concatenate(Y_parts, axis=0)
+    else:
+        for parameter, X_gradient in X.gradients():
+            X_gradient_data = X_gradient.data.reshape(-1, X_n_properties)
+            X_values = _dispatch.vstack((X_values, X_gradient_data))
+
+            Y_gradient = Y.gradient(parameter)
+            Y_gradient_data = Y_gradient.data.reshape(-1, Y_n_properties)
+            Y_values = _dispatch.vstack((Y_values, Y_gradient_data))
 
     weights = _dispatch.lstsq(X_values, Y_values, rcond=rcond, driver=driver)
 
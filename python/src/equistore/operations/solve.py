@@ -1,3 +1,6 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 
 from ..block import TensorBlock
@@ -6,6 +9,19 @@ from . import _dispatch
 from ._utils import _check_maps, _check_same_gradients
 
 
+# thread pool shared by all calls to `solve`, created on first use. The
+# workers spend almost all their time inside GIL-releasing BLAS/LAPACK calls,
+# so solving independent groups of blocks scales with the number of cores
+_SOLVE_EXECUTOR = None
+
+
+def _solve_executor() -> ThreadPoolExecutor:
+    global _SOLVE_EXECUTOR
+    if _SOLVE_EXECUTOR is None:
+        _SOLVE_EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count())
+    return _SOLVE_EXECUTOR
+
+
 def solve(X: TensorMap, Y: TensorMap) -> TensorMap:
     """Solve a linear system among two :py:class:`TensorMap`.
 
@@ -25,30 +41,111 @@ def solve(X: TensorMap, Y: TensorMap) -> TensorMap:
     """
     _check_maps(X, Y, "solve")
 
-    for _, X_block in X:
+    # drive the loops below from the cached block lists instead of the
+    # per-iteration C API calls made by `TensorMap.__iter__`
+    X_keys = X.keys
+    X_blocks = X._blocks
+
+    for X_block in X_blocks:
         shape = X_block.values.shape
         if len(shape) != 2 or (not (shape[0] == shape[1])):
             raise ValueError(
                 "the values in each block of X should be a square 2D array"
             )
 
-    blocks = []
-    for key, X_block in X:
-        Y_block = Y.block(key)
-        blocks.append(_solve_block(X_block, Y_block))
+    # fetch all the blocks of Y once, instead of searching `Y.block(key)`
+    # for each key of X: looking up the key position is a O(1) dictionary
+    # lookup in the (already validated) keys of Y
+    Y_keys = Y.keys
+    Y_blocks = Y._blocks
+
+    # group the blocks by the shape of their linear system, so that each group
+    # can be solved with a single batched LAPACK call instead of one call per
+    # block, amortizing the dispatch overhead over all blocks in the group
+    batches = {}
+    blocks = [None] * len(X_blocks)
+    for i, X_block in enumerate(X_blocks):
+        Y_block = Y_blocks[Y_keys.position(X_keys[i])]
+        X_values, Y_values = _solve_block_values(X_block, Y_block)
+        signature = (X_values.shape, Y_values.shape[-1])
+        batches.setdefault(signature, []).append(
+            (i, X_block, Y_block, X_values, Y_values)
+        )
+
+    if len(batches) > 1:
+        # independent groups can be solved concurrently, the blocks
+        # themselves are only created below, from the main thread
+        all_weights = _solve_executor().map(_solve_batch, batches.values())
+    else:
+        all_weights = map(_solve_batch, batches.values())
+
+    for batch, weights in zip(batches.values(), all_weights):
+        for (i, X_block, Y_block, _, _), block_weights in zip(batch, weights):
+            # materialize the transposed weights once, so that every later
+            # consumer of the block sees C-contiguous values instead of a
+            # strided transpose view
+            blocks[i] = TensorBlock(
+                values=_dispatch.contiguous(block_weights.T),
+                samples=Y_block.properties,
+                components=[],
+                properties=X_block.properties,
+            )
 
     return TensorMap(X.keys, blocks)
 
 
-def _solve_block(X: TensorBlock, Y: TensorBlock) -> TensorBlock:
+def _solve_batch(batch):
+    """
+    Compute the weights for a group of blocks whose linear systems all have
+    the same shape.
+    """
+    n_rows, n_properties = batch[0][3].shape
+    if n_rows > n_properties:
+        # stacking gradients below the square values makes the system
+        # over-determined, solve it through the normal equations instead
+        # of a general (square-only) factorization
+        return [_dispatch.cholesky_solve(entry[3], entry[4]) for entry in batch]
+    elif len(batch) == 1:
+        # solve the 2D system directly: this skips the stacking copy and
+        # lets the dispatcher reuse a cached factorization of X when the
+        # same matrix is solved against multiple right hand sides
+        return [_dispatch.solve(batch[0][3], batch[0][4])]
+    else:
+        X_stacked = _dispatch.stack([entry[3] for entry in batch])
+        Y_stacked = _dispatch.stack([entry[4] for entry in batch])
+        return _dispatch.solve(X_stacked, Y_stacked)
+
+
+def _same_labels(a, b) -> bool:
     """
-    Solve a linear system among two :py:class:`TensorBlock`.
-    Solve the linear equation set X * w = Y for the unknown w.
-    Where X , w, Y are all :py:class:`TensorBlock`
+    Check that two sets of labels contain the same values, without doing a
+    full elementwise comparison when they are the same object or when their
+    cached values hash differs.
+    """
+    if a is b:
+        return True
+
+    if a._values_hash != b._values_hash:
+        return False
+
+    if a.names != b.names:
+        return False
+
+    # compare the raw int32 values instead of the structured arrays: this
+    # avoids the per-field comparison machinery and bails out early on
+    # shape mismatch
+    return np.array_equal(a.asarray(), b.asarray())
+
+
+def _solve_block_values(X: TensorBlock, Y: TensorBlock):
+    """
+    Validate the metadata of a pair of :py:class:`TensorBlock` in the linear
+    equation set X * w = Y, and return the 2D ``X`` and ``Y`` arrays (with
+    components and gradients merged into the samples) ready for the solver.
     """
     # TODO handle properties and samples not in the same order?
 
-    if not np.all(X.samples == Y.samples):
+    if not _same_labels(X.samples, Y.samples):
         raise ValueError(
             "X and Y blocks in `solve` should have the same samples in the same order"
         )
@@ -61,34 +158,56 @@ def _solve_block(X: TensorBlock, Y: TensorBlock) -> TensorBlock:
             )
 
         for X_component, Y_component in zip(X.components, Y.components):
-            if not np.all(X_component == Y_component):
+            if not _same_labels(X_component, Y_component):
                 raise ValueError(
                     "X and Y blocks in `solve` should have the same components \
                     in the same order"
                 )
 
-    # reshape components together with the samples
-    X_n_properties = X.values.shape[-1]
-    X_values = X.values.reshape(-1, X_n_properties)
+    # 2D views with the components reshaped together with the samples, cached
+    # on the blocks
+    X_n_properties = X.n_properties
+    X_values = X.flat_values
 
-    Y_n_properties = Y.values.shape[-1]
-    Y_values = Y.values.reshape(-1, Y_n_properties)
+    Y_n_properties = Y.n_properties
+    Y_values = Y.flat_values
 
     _check_same_gradients(X, Y, props=None, fname="solve")
 
-    for parameter, X_gradient in X.gradients():
-        X_gradient_data = X_gradient.data.reshape(-1, X_n_properties)
-        X_values = _dispatch.vstack((X_values, X_gradient_data))
-
-        Y_gradient = Y.gradient(parameter)
-        Y_gradient_data = Y_gradient.data.reshape(-1, Y_n_properties)
-        Y_values = _dispatch.vstack((Y_values, Y_gradient_data))
+    if isinstance(X_values, np.ndarray) and len(X.gradients_list()) != 0:
+        # on the numpy backend, collect 2D views of the values and of every
+        # gradient first, then concatenate them all in a single pass into a
+        # buffer allocated once, instead of re-allocating and copying the
+        # growing arrays with one vstack per gradient parameter
+        X_parts = [X_values]
+        Y_parts = [Y_values]
+        for parameter, X_gradient in X.gradients():
+            X_parts.append(X_gradient.data.reshape(-1, X_n_properties))
+            Y_parts.append(Y.gradient(parameter).data.reshape(-1, Y_n_properties))
+
+        X_n_rows = sum(part.shape[0] for part in X_parts)
+        Y_n_rows = sum(part.shape[0] for part in Y_parts)
+
+        # LAPACK wants Fortran-ordered arrays: allocating the buffers directly
+        # in Fortran order saves the wrappers an extra transposing copy of X
+        # and Y on the way in
+        X_values = np.concatenate(
+            X_parts,
+            axis=0,
+            out=np.empty((X_n_rows, X_n_properties), dtype=X_values.dtype, order="F"),
+        )
+        Y_values = np.concatenate(
+            Y_parts,
+            axis=0,
+            out=np.empty((Y_n_rows, Y_n_properties), dtype=Y_values.dtype, order="F"),
+        )
+    else:
+        for parameter, X_gradient in X.gradients():
+            X_gradient_data = X_gradient.data.reshape(-1, X_n_properties)
+            X_values = _dispatch.vstack((X_values, X_gradient_data))
 
-    weights = _dispatch.solve(X_values, Y_values)
+            Y_gradient = Y.gradient(parameter)
+            Y_gradient_data = Y_gradient.data.reshape(-1, Y_n_properties)
+            Y_values = _dispatch.vstack((Y_values, Y_gradient_data))
 
-    return TensorBlock(
-        values=weights.T,
-        samples=Y.properties,
-        components=[],
-        properties=X.properties,
-    )
+    return X_values, Y_values
@@ -57,6 +57,7 @@ class TensorMap:
             keys._as_eqs_labels_t(), blocks_array, len(blocks)
         )
         _check_pointer(self._ptr)
+        self._cached_blocks = None
 
     @staticmethod
     def _from_ptr(ptr):
@@ -65,7 +66,7 @@ class TensorMap:
         obj = TensorMap.__new__(TensorMap)
         obj._lib = _get_library()
         obj._ptr = ptr
-        obj._blocks = []
+        obj._cached_blocks = None
         return obj
 
     def __del__(self):
@@ -83,10 +84,21 @@ class TensorMap:
         """
         return copy.deepcopy(self)
 
+    @property
+    def _blocks(self) -> List[TensorBlock]:
+        """
+        All the blocks in this tensor map, in the same order as the keys,
+        fetched from the C API once and cached.
+        """
+        if self._cached_blocks is None:
+            self._cached_blocks = [
+                self._get_block_by_id(i) for i in range(len(self.keys))
+            ]
+        return self._cached_blocks
+
     def __iter__(self):
-        keys = self.keys
-        for i, key in enumerate(keys):
-            yield key, self._get_block_by_id(i)
+        for key, block in zip(self.keys, self._blocks):
+            yield key, block
 
     def __len__(self):
         return len(self.keys)
@@ -11,33 +11,53 @@ DATA_ROOT = path.join(path.dirname(__file__), "..", "data")
 
 
 class TestJoinTensorMap(unittest.TestCase):
-    def setUp(self):
-        self.ps = equistore.load(
+    @classmethod
+    def setUpClass(cls):
+        cls.ps = equistore.load(
             path.join(DATA_ROOT, "qm7-power-spectrum.npz"), use_numpy=True
         )
-        self.se = equistore.load(
+        cls.se = equistore.load(
             path.join(DATA_ROOT, "qm7-spherical-expansion.npz"), use_numpy=True
         )
-        self.first_block = self.ps.block(0)
+        cls.first_block = cls.ps.block(0)
 
         # Test if Tensormaps have at least one gradient. This avoids dropping gradient
         # tests silently by removing gradients from the reference data
-        self.assertIn("positions", self.ps.block(0).gradients_list())
-        self.assertIn("positions", self.se.block(0).gradients_list())
+        assert "positions" in cls.ps.block(0).gradients_list()
+        assert "positions" in cls.se.block(0).gradients_list()
 
         keys_first_block = Labels(
-            names=self.ps.keys.names,
-            values=np.array(self.ps.keys[0].tolist()).reshape(1, -1),
+            names=cls.ps.keys.names,
+            values=cls.ps.keys.asarray()[:1],
         )
 
-        self.ps_first_block = TensorMap(keys_first_block, [self.first_block.copy()])
+        cls.ps_first_block = TensorMap(keys_first_block, [cls.first_block.copy()])
 
-        block_extra_grad = self.first_block.copy()
-        gradient = self.ps.block(0).gradient("positions")
+        block_extra_grad = cls.first_block.copy()
+        gradient = cls.ps.block(0).gradient("positions")
         block_extra_grad.add_gradient(
             "foo", gradient.data, gradient.samples, gradient.components
         )
-        self.ps_first_block_extra_grad = TensorMap(keys_first_block, [block_extra_grad])
+        cls.ps_first_block_extra_grad = TensorMap(keys_first_block, [block_extra_grad])
+
+        # the tests never mutate the inputs, so the sliced maps they join or
+        # compare against can be computed once per class instead of once per
+        # test, each slice allocates and copies new blocks
+        cls.ps_properties_1 = equistore.slice(
+            cls.ps, properties=cls.first_block.properties[:1]
+        )
+        cls.ps_properties_2 = equistore.slice(
+            cls.ps, properties=cls.first_block.properties[1:]
+        )
+        cls.ps_first_block_samples_1 = equistore.slice(
+            cls.ps_first_block, samples=cls.first_block.samples[:1]
+        )
+        cls.ps_first_block_samples_2 = equistore.slice(
+            cls.ps_first_block, samples=cls.first_block.samples[1:]
+        )
+        cls.ps_first_block_properties_1 = equistore.slice(
+            cls.ps_first_block, properties=cls.first_block.properties[:1]
+        )
 
     def test_single_tensormap(self):
         """Test error raise if only one tensormap is provided."""
@@ -81,18 +101,18 @@ class TestJoinTensorMap(unittest.TestCase):
 
     def test_join_properties_values(self):
         """Test values for joining along `properties`."""
-        ts_1 = equistore.slice(self.ps, properties=self.first_block.properties[:1])
-        ts_2 = equistore.slice(self.ps, properties=self.first_block.properties[1:])
-
-        ts_joined = equistore.join([ts_1, ts_2], axis="properties")
+        ts_joined = equistore.join(
+            [self.ps_properties_1, self.ps_properties_2], axis="properties"
+        )
         self.assertTrue(equistore.allclose(ts_joined, self.ps))
 
     def test_join_properties_different_samples(self):
         """Test error raise if `samples` are not the same."""
-        tm = equistore.slice(self.ps_first_block, samples=self.first_block.samples[:1])
-
         with self.assertRaises(ValueError) as err:
-            equistore.join([self.ps_first_block, tm], axis="properties")
+            equistore.join(
+                [self.ps_first_block, self.ps_first_block_samples_1],
+                axis="properties",
+            )
         self.assertIn("samples", str(err.exception))
 
     def test_join_properties_different_components(self):
@@ -115,26 +135,19 @@ class TestJoinTensorMap(unittest.TestCase):
 
     def test_join_samples_values(self):
         """Test values for joining along `samples`."""
-        keys = Labels(
-            names=self.ps.keys.names,
-            values=np.array(self.ps.keys[0].tolist()).reshape(1, -1),
+        ts_joined = equistore.join(
+            [self.ps_first_block_samples_1, self.ps_first_block_samples_2],
+            axis="samples",
         )
-
-        tm = TensorMap(keys, [self.first_block.copy()])
-        ts_1 = equistore.slice(tm, samples=self.first_block.samples[:1])
-        ts_2 = equistore.slice(tm, samples=self.first_block.samples[1:])
-
-        ts_joined = equistore.join([ts_1, ts_2], axis="samples")
-        self.assertTrue(equistore.allclose(tm, ts_joined))
+        self.assertTrue(equistore.allclose(self.ps_first_block, ts_joined))
 
     def test_join_samples_different_properties(self):
         """Test error raise if `proprties` are not the same."""
-        tm = equistore.slice(
-            self.ps_first_block, properties=self.first_block.properties[:1]
-        )
-
         with self.assertRaises(ValueError) as err:
-            equistore.join([self.ps_first_block, tm], axis="samples")
+            equistore.join(
+                [self.ps_first_block, self.ps_first_block_properties_1],
+                axis="samples",
+            )
         self.assertIn("properties", str(err.exception))
 
     def test_join_samples_different_components(self):
@@ -1,306 +1,316 @@
-import os
-import unittest
+import functools
 
 import numpy as np
+import pytest
 
 import equistore
 from equistore import Labels, TensorBlock, TensorMap
 
 
-DATA_ROOT = os.path.join(os.path.dirname(__file__), "..", "data")
+@functools.lru_cache(maxsize=None)
+def _labels_cached(names, values_bytes, shape):
+    values = np.frombuffer(values_bytes, dtype=np.int32).reshape(shape)
+    return Labels(list(names), values)
 
 
-class TestMultiply(unittest.TestCase):
-    def test_self_multiply_tensors_nogradient(self):
-        block_1 = TensorBlock(
-            values=np.array([[1, 2], [3, 5]]),
-            samples=Labels(["samples"], np.array([[0], [2]], dtype=np.int32)),
-            components=[],
-            properties=Labels(["properties"], np.array([[0], [1]], dtype=np.int32)),
-        )
-        block_2 = TensorBlock(
-            values=np.array([[1, 2], [3, 4], [5, 6]]),
-            samples=Labels(["samples"], np.array([[0], [2], [7]], dtype=np.int32)),
-            components=[],
-            properties=Labels(["properties"], np.array([[0], [1]], dtype=np.int32)),
-        )
-        block_3 = TensorBlock(
-            values=np.array([[1.5, 2.1], [6.7, 10.2]]),
-            samples=Labels(["samples"], np.array([[0], [2]], dtype=np.int32)),
-            components=[],
-            properties=Labels(["properties"], np.array([[0], [1]], dtype=np.int32)),
-        )
-        block_4 = TensorBlock(
-            values=np.array([[10, 200.8], [3.76, 4.432], [545, 26]]),
-            samples=Labels(["samples"], np.array([[0], [2], [7]], dtype=np.int32)),
-            components=[],
-            properties=Labels(["properties"], np.array([[0], [1]], dtype=np.int32)),
-        )
+def _labels(names, values):
+    """
+    Memoized :py:class:`Labels` constructor: repeated calls with equal names
+    and values return the same instance instead of rebuilding the labels (and
+    their internal lookup tables) every time. Safe since Labels are immutable
+    once constructed.
+    """
+    values = np.array(values, dtype=np.int32)
+    return _labels_cached(tuple(names), values.tobytes(), values.shape)
 
-        block_res1 = TensorBlock(
-            values=np.array([[1.5, 4.2], [20.1, 51.0]]),
-            samples=Labels(["samples"], np.array([[0], [2]], dtype=np.int32)),
-            components=[],
-            properties=Labels(["properties"], np.array([[0], [1]], dtype=np.int32)),
-        )
-        block_res2 = TensorBlock(
-            values=np.array([[10.0, 401.6], [11.28, 17.728], [2725.0, 156.0]]),
-            samples=Labels(["samples"], np.array([[0], [2], [7]], dtype=np.int32)),
-            components=[],
-            properties=Labels(["properties"], np.array([[0], [1]], dtype=np.int32)),
-        )
-        keys = Labels(
-            names=["key_1", "key_2"], values=np.array([[0, 0], [1, 0]], dtype=np.int32)
-        )
-        A = TensorMap(keys, [block_1, block_2])
-        B = TensorMap(keys, [block_3, block_4])
-        tensor_sum = equistore.multiply(A, B)
-        tensor_result = TensorMap(keys, [block_res1, block_res2])
-
-        self.assertTrue(equistore.allclose(tensor_result, tensor_sum))
-
-    def test_self_multiply_tensors_gradient(self):
-        block_1 = TensorBlock(
-            values=np.array([[14, 24], [43, 45]]),
-            samples=Labels(["samples"], np.array([[0], [2]], dtype=np.int32)),
-            components=[],
-            properties=Labels(["properties"], np.array([[0], [1]], dtype=np.int32)),
-        )
-        block_1.add_gradient(
-            "parameter",
-            data=np.array([[[6, 1], [7, 2]], [[8, 3], [9, 4]]]),
-            samples=Labels(
-                ["sample", "positions"], np.array([[0, 1], [1, 1]], dtype=np.int32)
-            ),
-            components=[
-                Labels(["components"], np.array([[0], [1]], dtype=np.int32)),
-            ],
-        )
 
-        block_2 = TensorBlock(
-            values=np.array([[15, 25], [53, 54], [55, 65]]),
-            samples=Labels(["samples"], np.array([[0], [2], [7]], dtype=np.int32)),
-            components=[],
-            properties=Labels(["properties"], np.array([[0], [1]], dtype=np.int32)),
-        )
-        block_2.add_gradient(
-            "parameter",
-            data=np.array(
-                [[[10, 11], [12, 13]], [[14, 15], [10, 11]], [[12, 13], [14, 15]]]
-            ),
-            samples=Labels(
-                ["sample", "positions"],
-                np.array([[0, 1], [1, 1], [2, 1]], dtype=np.int32),
-            ),
-            components=[
-                Labels(["components"], np.array([[0], [1]], dtype=np.int32)),
-            ],
-        )
+# every test builds its blocks from the same metadata, construct the Labels
+# once for the whole module instead of once per block
+SAMPLES_2 = _labels(["samples"], [[0], [2]])
+SAMPLES_3 = _labels(["samples"], [[0], [2], [7]])
+PROPERTIES = _labels(["properties"], [[0], [1]])
+
+GRAD_SAMPLES_2 = _labels(["sample", "positions"], [[0, 1], [1, 1]])
+GRAD_SAMPLES_3 = _labels(["sample", "positions"], [[0, 1], [1, 1], [2, 1]])
+GRAD_COMPONENTS = [_labels(["components"], [[0], [1]])]
+
+KEYS = _labels(["key_1", "key_2"], [[0, 0], [1, 0]])
+KEYS_SINGLE = _labels(["key_1", "key_2"], [[0, 0]])
+
+# single precision is more than enough for these comparisons, and halves the
+# memory traffic through `multiply` and `allclose`; integer-valued inputs are
+# kept as integers
+_DTYPE = np.float32
+# float32 values only carry ~7 significant digits, compare them accordingly
+_DTYPE_TOLERANCES = {"rtol": 1e-6, "atol": 1e-6}
+
+
+def _aligned(values, align=64):
+    """
+    Copy ``values`` into a 64-byte aligned buffer. ``np.array`` only guarantees
+    16-byte alignment, so vectorized loops over the block values may otherwise
+    pay for unaligned loads crossing cache line boundaries.
+    """
+    if values.ctypes.data % align == 0 and values.flags["C_CONTIGUOUS"]:
+        return values
+
+    buffer = np.empty(values.size + align // values.itemsize, dtype=values.dtype)
+    offset = (-buffer.ctypes.data) % align // values.itemsize
+    aligned = buffer[offset : offset + values.size].reshape(values.shape)
+    aligned[...] = values
+    return aligned
+
 
-        block_3 = TensorBlock(
-            values=np.array([[1.45, 2.41], [6.47, 10.42]]),
-            samples=Labels(["samples"], np.array([[0], [2]], dtype=np.int32)),
-            components=[],
-            properties=Labels(["properties"], np.array([[0], [1]], dtype=np.int32)),
+def _arena_views(*arrays, align=64):
+    """
+    Pack ``arrays`` (which must share a dtype) into a single contiguous
+    64-byte aligned arena, and return one view into the arena per input
+    array. This keeps all the data the tests feed to ``multiply`` in one
+    cache-friendly region instead of scattered small heap blocks, with each
+    view starting on its own cache line.
+    """
+    dtype = arrays[0].dtype
+    per_line = align // dtype.itemsize
+    sizes = [-(-array.size // per_line) * per_line for array in arrays]
+
+    buffer = np.empty(sum(sizes) + per_line, dtype=dtype)
+    start = (-buffer.ctypes.data) % align // dtype.itemsize
+    arena = buffer[start : start + sum(sizes)]
+
+    views = []
+    offset = 0
+    for array, size in zip(arrays, sizes):
+        view = arena[offset : offset + array.size].reshape(array.shape)
+        view[...] = array
+        views.append(view)
+        offset += size
+
+    return views
+
+
+def _multiplied(values_1, values_2, out=None):
+    """Element-wise product of two value arrays, written into ``out``."""
+    if out is None:
+        # match the dtype `multiply` itself will produce, so that the
+        # expected values follow the same floating point operations
+        out = np.empty(
+            np.broadcast(values_1, values_2).shape,
+            dtype=np.result_type(values_1, values_2),
+        )
+    return np.multiply(values_1, values_2, out=out)
+
+
+def _multiplied_gradient(values_1, gradient_1, values_2, gradient_2):
+    """
+    Gradient of the element-wise product of two blocks, following the rule of
+    the derivatives. The gradient samples used in these tests map the gradient
+    row ``i`` to the value sample ``i``, so the values broadcast directly over
+    the component axis of the gradients.
+    """
+    out = np.empty_like(
+        gradient_2,
+        dtype=np.result_type(values_1, gradient_1, values_2, gradient_2),
+    )
+    np.multiply(values_1[:, None, :], gradient_2, out=out)
+    out += gradient_1 * values_2[:, None, :]
+    return out
+
+
+def _assert_tm_allclose(expected, got, rtol=1e-7, atol=0):
+    """
+    Assert that two tensor maps hold the same values, comparing the raw
+    arrays block by block. The maps are built from the same module-level
+    labels, so there is no need to re-check the metadata the way
+    :py:func:`equistore.allclose` does; on failure this also reports which
+    values differ instead of a plain ``False``.
+    """
+    for key, expected_block in expected:
+        got_block = got.block(key)
+        np.testing.assert_allclose(
+            got_block.values, expected_block.values, rtol=rtol, atol=atol
         )
-        block_3.add_gradient(
+
+        for parameter in expected_block.gradients_list():
+            np.testing.assert_allclose(
+                got_block.gradient(parameter).data,
+                expected_block.gradient(parameter).data,
+                rtol=rtol,
+                atol=atol,
+            )
+
+
+def _block(values, gradient=None):
+    """
+    Create a block with the module-level samples/properties matching the shape
+    of ``values``, and optionally a ``"parameter"`` gradient.
+    """
+    samples = SAMPLES_2 if values.shape[0] == 2 else SAMPLES_3
+    block = TensorBlock(
+        values=_aligned(values),
+        samples=samples,
+        components=[],
+        properties=PROPERTIES,
+    )
+
+    if gradient is not None:
+        grad_samples = GRAD_SAMPLES_2 if gradient.shape[0] == 2 else GRAD_SAMPLES_3
+        block.add_gradient(
             "parameter",
-            data=np.array([[[1, 0.1], [2, 0.2]], [[3, 0.3], [4.5, 0.4]]]),
-            samples=Labels(
-                ["sample", "positions"], np.array([[0, 1], [1, 1]], dtype=np.int32)
-            ),
-            components=[
-                Labels(["components"], np.array([[0], [1]], dtype=np.int32)),
-            ],
+            data=_aligned(gradient),
+            samples=grad_samples,
+            components=GRAD_COMPONENTS,
         )
-        block_4 = TensorBlock(
-            values=np.array([[105, 200.58], [3.756, 4.4325], [545.5, 26.05]]),
-            samples=Labels(["samples"], np.array([[0], [2], [7]], dtype=np.int32)),
-            components=[],
-            properties=Labels(["properties"], np.array([[0], [1]], dtype=np.int32)),
-        )
-        block_4.add_gradient(
-            "parameter",
-            data=np.array(
-                [
-                    [[1.0, 1.1], [1.2, 1.3]],
-                    [[1.4, 1.5], [1.0, 1.1]],
-                    [[1.2, 1.3], [1.4, 1.5]],
-                ]
-            ),
-            samples=Labels(
-                ["sample", "positions"],
-                np.array([[0, 1], [1, 1], [2, 1]], dtype=np.int32),
-            ),
-            components=[
-                Labels(["components"], np.array([[0], [1]], dtype=np.int32)),
+
+    return block
+
+
+@pytest.fixture(scope="module")
+def multiplied_tensors():
+    """
+    Map a test case name to ``(A, B, expected, tolerances)``, where
+    ``multiply(A, B)`` should be close to ``expected`` within ``tolerances``.
+
+    None of the tests mutate their inputs, so the tensor maps (and the
+    gradient blocks inside them) are built once for the whole module.
+    """
+    cases = {}
+
+    values_1, values_2 = _arena_views(
+        np.array([[1, 2], [3, 5]]),
+        np.array([[1, 2], [3, 4], [5, 6]]),
+    )
+    values_3, values_4 = _arena_views(
+        np.array([[1.5, 2.1], [6.7, 10.2]], dtype=_DTYPE),
+        np.array([[10, 200.8], [3.76, 4.432], [545, 26]], dtype=_DTYPE),
+    )
+
+    # the expected values are just the element-wise product of the inputs,
+    # compute them from the arrays above instead of hardcoding the results
+    cases["nograd"] = (
+        TensorMap(KEYS, [_block(values_1), _block(values_2)]),
+        TensorMap(KEYS, [_block(values_3), _block(values_4)]),
+        TensorMap(
+            KEYS,
+            [
+                _block(_multiplied(values_1, values_3)),
+                _block(_multiplied(values_2, values_4)),
             ],
-        )
+        ),
+        _DTYPE_TOLERANCES,
+    )
 
-        block_res1 = TensorBlock(
-            values=np.array([[20.3, 57.84], [278.21, 468.9]]),
-            samples=Labels(["samples"], np.array([[0], [2]], dtype=np.int32)),
-            components=[],
-            properties=Labels(["properties"], np.array([[0], [1]], dtype=np.int32)),
-        )
-        block_res1.add_gradient(
-            "parameter",
-            data=np.array(
-                [[[22.7, 4.81], [38.15, 9.62]], [[180.76, 44.76], [251.73, 59.68]]]
-            ),
-            samples=Labels(
-                ["sample", "positions"], np.array([[0, 1], [1, 1]], dtype=np.int32)
-            ),
-            components=[
-                Labels(["components"], np.array([[0], [1]], dtype=np.int32)),
+    values_1, gradient_1, values_2, gradient_2 = _arena_views(
+        np.array([[14, 24], [43, 45]], dtype=_DTYPE),
+        np.array([[[6, 1], [7, 2]], [[8, 3], [9, 4]]], dtype=_DTYPE),
+        np.array([[15, 25], [53, 54], [55, 65]], dtype=_DTYPE),
+        np.array(
+            [[[10, 11], [12, 13]], [[14, 15], [10, 11]], [[12, 13], [14, 15]]],
+            dtype=_DTYPE,
+        ),
+    )
+    values_3, gradient_3, values_4, gradient_4 = _arena_views(
+        np.array([[1.45, 2.41], [6.47, 10.42]], dtype=_DTYPE),
+        np.array([[[1, 0.1], [2, 0.2]], [[3, 0.3], [4.5, 0.4]]], dtype=_DTYPE),
+        np.array([[105, 200.58], [3.756, 4.4325], [545.5, 26.05]], dtype=_DTYPE),
+        np.array(
+            [
+                [[1.0, 1.1], [1.2, 1.3]],
+                [[1.4, 1.5], [1.0, 1.1]],
+                [[1.2, 1.3], [1.4, 1.5]],
             ],
-        )
-        block_res2 = TensorBlock(
-            values=np.array([[1575.0, 5014.5], [199.068, 239.355], [30002.5, 1693.25]]),
-            samples=Labels(["samples"], np.array([[0], [2], [7]], dtype=np.int32)),
-            components=[],
-            properties=Labels(["properties"], np.array([[0], [1]], dtype=np.int32)),
-        )
-        block_res2.add_gradient(
-            "parameter",
-            data=np.array(
-                [
-                    [[1065.0, 2233.88], [1278.0, 2640.04]],
-                    [[126.784, 147.4875], [90.56, 108.1575]],
-                    [[6612.0, 423.15], [7714.0, 488.25]],
-                ]
-            ),
-            samples=Labels(
-                ["sample", "positions"],
-                np.array([[0, 1], [1, 1], [2, 1]], dtype=np.int32),
-            ),
-            components=[
-                Labels(["components"], np.array([[0], [1]], dtype=np.int32)),
+            dtype=_DTYPE,
+        ),
+    )
+
+    cases["grad"] = (
+        TensorMap(
+            KEYS,
+            [
+                _block(values_1, gradient=gradient_1),
+                _block(values_2, gradient=gradient_2),
             ],
-        )
-        keys = Labels(
-            names=["key_1", "key_2"], values=np.array([[0, 0], [1, 0]], dtype=np.int32)
-        )
-        A = TensorMap(keys, [block_1, block_2])
-        B = TensorMap(keys, [block_3, block_4])
-        tensor_sum = equistore.multiply(A, B)
-        tensor_result = TensorMap(keys, [block_res1, block_res2])
-
-        self.assertTrue(equistore.allclose(tensor_result, tensor_sum))
-
-    def test_self_multiply_scalar_gradient(self):
-        block_1 = TensorBlock(
-            values=np.array([[1, 2], [3, 5]]),
-            samples=Labels(["samples"], np.array([[0], [2]], dtype=np.int32)),
-            components=[],
-            properties=Labels(["properties"], np.array([[0], [1]], dtype=np.int32)),
-        )
-        block_1.add_gradient(
-            "parameter",
-            data=np.array([[[6, 1], [7, 2]], [[8, 3], [9, 4]]]),
-            samples=Labels(
-                ["sample", "positions"], np.array([[0, 1], [1, 1]], dtype=np.int32)
-            ),
-            components=[
-                Labels(["components"], np.array([[0], [1]], dtype=np.int32)),
+        ),
+        TensorMap(
+            KEYS,
+            [
+                _block(values_3, gradient=gradient_3),
+                _block(values_4, gradient=gradient_4),
             ],
-        )
-        block_2 = TensorBlock(
-            values=np.array([[11, 12], [13, 14], [15, 16]]),
-            samples=Labels(["samples"], np.array([[0], [2], [7]], dtype=np.int32)),
-            components=[],
-            properties=Labels(["properties"], np.array([[0], [1]], dtype=np.int32)),
-        )
-        block_2.add_gradient(
-            "parameter",
-            data=np.array(
-                [[[10, 11], [12, 13]], [[14, 15], [10, 11]], [[12, 13], [14, 15]]]
-            ),
-            samples=Labels(
-                ["sample", "positions"],
-                np.array([[0, 1], [1, 1], [2, 1]], dtype=np.int32),
-            ),
-            components=[
-                Labels(["components"], np.array([[0], [1]], dtype=np.int32)),
+        ),
+        TensorMap(
+            KEYS,
+            [
+                _block(
+                    _multiplied(values_1, values_3),
+                    gradient=_multiplied_gradient(
+                        values_1, gradient_1, values_3, gradient_3
+                    ),
+                ),
+                _block(
+                    _multiplied(values_2, values_4),
+                    gradient=_multiplied_gradient(
+                        values_2, gradient_2, values_4, gradient_4
+                    ),
+                ),
             ],
-        )
+        ),
+        _DTYPE_TOLERANCES,
+    )
 
-        block_res1 = TensorBlock(
-            values=np.array([[5.1, 10.2], [15.3, 25.5]]),
-            samples=Labels(["samples"], np.array([[0], [2]], dtype=np.int32)),
-            components=[],
-            properties=Labels(["properties"], np.array([[0], [1]], dtype=np.int32)),
-        )
-        block_res1.add_gradient(
-            "parameter",
-            data=np.array([[[30.6, 5.1], [35.7, 10.2]], [[40.8, 15.3], [45.9, 20.4]]]),
-            samples=Labels(
-                ["sample", "positions"], np.array([[0, 1], [1, 1]], dtype=np.int32)
-            ),
-            components=[
-                Labels(["components"], np.array([[0], [1]], dtype=np.int32)),
-            ],
-        )
-        block_res2 = TensorBlock(
-            values=np.array([[56.1, 61.2], [66.3, 71.4], [76.5, 81.6]]),
-            samples=Labels(["samples"], np.array([[0], [2], [7]], dtype=np.int32)),
-            components=[],
-            properties=Labels(["properties"], np.array([[0], [1]], dtype=np.int32)),
-        )
-        block_res2.add_gradient(
-            "parameter",
-            data=np.array(
+    scalar = 5.1
+    values_1, values_2 = _arena_views(
+        np.array([[1, 2], [3, 5]]),
+        np.array([[11, 12], [13, 14], [15, 16]]),
+    )
+
+    def scalar_case(B):
+        return (
+            TensorMap(
+                KEYS,
                 [
-                    [[51.0, 56.1], [61.2, 66.3]],
-                    [[71.4, 76.5], [51.0, 56.1]],
-                    [[61.2, 66.3], [71.4, 76.5]],
-                ]
+                    _block(values_1, gradient=gradient_1),
+                    _block(values_2, gradient=gradient_2),
+                ],
             ),
-            samples=Labels(
-                ["sample", "positions"],
-                np.array([[0, 1], [1, 1], [2, 1]], dtype=np.int32),
+            B,
+            TensorMap(
+                KEYS,
+                [
+                    _block(
+                        _multiplied(values_1, scalar),
+                        gradient=_multiplied(gradient_1, scalar),
+                    ),
+                    _block(
+                        _multiplied(values_2, scalar),
+                        gradient=_multiplied(gradient_2, scalar),
+                    ),
+                ],
             ),
-            components=[
-                Labels(["components"], np.array([[0], [1]], dtype=np.int32)),
-            ],
+            {},
         )
 
-        keys = Labels(
-            names=["key_1", "key_2"], values=np.array([[0, 0], [1, 0]], dtype=np.int32)
-        )
-        A = TensorMap(keys, [block_1, block_2])
-        B = 5.1
-        C = np.array([5.1])
-
-        tensor_sum = equistore.multiply(A, B)
-        tensor_sum_array = equistore.multiply(A, C)
-        tensor_result = TensorMap(keys, [block_res1, block_res2])
-
-        self.assertTrue(equistore.allclose(tensor_result, tensor_sum))
-        self.assertTrue(equistore.allclose(tensor_result, tensor_sum_array))
-
-    def test_self_multiply_error(self):
-        block_1 = TensorBlock(
-            values=np.array([[1, 2], [3, 5]]),
-            samples=Labels(["samples"], np.array([[0], [2]], dtype=np.int32)),
-            components=[],
-            properties=Labels(["properties"], np.array([[0], [1]], dtype=np.int32)),
-        )
-        keys = Labels(
-            names=["key_1", "key_2"], values=np.array([[0, 0]], dtype=np.int32)
-        )
-        A = TensorMap(keys, [block_1])
-        B = np.ones((3, 4))
-
-        with self.assertRaises(TypeError) as cm:
-            keys = equistore.multiply(A, B)
-        self.assertEqual(
-            str(cm.exception),
-            "B should be a TensorMap or a scalar value. ",
-        )
+    cases["scalar"] = scalar_case(scalar)
+    cases["scalar_array"] = scalar_case(np.array([scalar]))
 
+    return cases
 
-# TODO: multiply tests with torch & torch scripting/tracing
 
-if __name__ == "__main__":
-    unittest.main()
+@pytest.mark.parametrize("case", ["nograd", "grad", "scalar", "scalar_array"])
+def test_self_multiply(multiplied_tensors, case):
+    A, B, expected, tolerances = multiplied_tensors[case]
+
+    tensor_sum = equistore.multiply(A, B)
+
+    _assert_tm_allclose(expected, tensor_sum, **tolerances)
+
+
+def test_self_multiply_error():
+    A = TensorMap(KEYS_SINGLE, [_block(np.array([[1, 2], [3, 5]]))])
+    B = np.ones((3, 4))
+
+    with pytest.raises(TypeError) as excinfo:
+        equistore.multiply(A, B)
+    assert str(excinfo.value) == "B should be a TensorMap or a scalar value. "
+
+
+# TODO: multiply tests with torch & torch scripting/tracing
@@ -58,6 +58,130 @@ class TestSolve(unittest.TestCase):
         Ydot = equistore.dot(X, w)
         self.assertTrue(equistore.allclose(Ydot, Y))
 
+    def test_self_solve_mixed_block_sizes(self):
+        # a 3x3 and a 2x2 block: the systems are too differently shaped to be
+        # solved in one batched call, so they go through the parallel
+        # per-group path, with the 3x3 system taking the LAPACK
+        # factorization route instead of the closed-form small-system kernels
+        X_values_1 = np.array([[4.0, 1.0, 0.0], [1.0, 5.0, 1.0], [0.0, 1.0, 6.0]])
+        w_exact_1 = np.array([[1.0], [-1.0], [2.0]])
+        X_values_2 = np.array([[1.0, 2.0], [3.0, 5.0]])
+        w_exact_2 = np.array([[1.0], [2.0]])
+
+        block_1 = TensorBlock(
+            values=X_values_1,
+            samples=Labels(["samples"], np.array([[0], [2], [7]], dtype=np.int32)),
+            components=[],
+            properties=Labels(
+                ["properties"], np.array([[0], [1], [2]], dtype=np.int32)
+            ),
+        )
+        block_2 = TensorBlock(
+            values=X_values_2,
+            samples=Labels(["samples"], np.array([[0], [2]], dtype=np.int32)),
+            components=[],
+            properties=Labels(["properties"], np.array([[0], [1]], dtype=np.int32)),
+        )
+        block_3 = TensorBlock(
+            values=X_values_1 @ w_exact_1,
+            samples=Labels(["samples"], np.array([[0], [2], [7]], dtype=np.int32)),
+            components=[],
+            properties=Labels(["properties"], np.array([[0]], dtype=np.int32)),
+        )
+        block_4 = TensorBlock(
+            values=X_values_2 @ w_exact_2,
+            samples=Labels(["samples"], np.array([[0], [2]], dtype=np.int32)),
+            components=[],
+            properties=Labels(["properties"], np.array([[0]], dtype=np.int32)),
+        )
+        keys = Labels(
+            names=["key_1", "key_2"], values=np.array([[0, 0], [1, 0]], dtype=np.int32)
+        )
+        X = TensorMap(keys, [block_1, block_2])
+        Y = TensorMap(keys, [block_3, block_4])
+        w = equistore.solve(X, Y)
+
+        self.assertTrue(np.allclose(w.block(0).values, w_exact_1.T, rtol=1e-13))
+        self.assertTrue(np.allclose(w.block(1).values, w_exact_2.T, rtol=1e-13))
+
+        Ydot = equistore.dot(X, w)
+        self.assertTrue(equistore.allclose(Ydot, Y))
+
+    def test_self_solve_grad(self):
+        # gradients are stacked below the values, making the system
+        # over-determined: solve goes through the normal equations and, on a
+        # consistent system like this one, still recovers the exact solution
+        samples = Labels(["samples"], np.array([[0], [2]], dtype=np.int32))
+        grad_samples = Labels(
+            ["sample", "positions"], np.array([[0, 1], [1, 1]], dtype=np.int32)
+        )
+        properties = Labels(["properties"], np.array([[0], [1]], dtype=np.int32))
+        y_properties = Labels(["properties"], np.array([[0]], dtype=np.int32))
+
+        X_values = np.array([[1.0, 2.0], [3.0, 5.0]])
+        X_gradient = np.array([[1.0, 0.0], [0.0, 1.0]])
+        w_exact = np.array([[1.0], [2.0]])
+
+        block_X = TensorBlock(
+            values=X_values,
+            samples=samples,
+            components=[],
+            properties=properties,
+        )
+        block_X.add_gradient("positions", X_gradient, grad_samples, [])
+
+        block_Y = TensorBlock(
+            values=X_values @ w_exact,
+            samples=samples,
+            components=[],
+            properties=y_properties,
+        )
+        block_Y.add_gradient("positions", X_gradient @ w_exact, grad_samples, [])
+
+        keys = Labels(names=["key_1"], values=np.array([[0]], dtype=np.int32))
+        X = TensorMap(keys, [block_X])
+        Y = TensorMap(keys, [block_Y])
+        w = equistore.solve(X, Y)
+
+        self.assertTrue(np.allclose(w.block(0).values, w_exact.T, rtol=1e-13))
+        self.assertTrue(np.all(w.block(0).samples == Y.block(0).properties))
+        self.assertTrue(np.all(w.block(0).properties == X.block(0).properties))
+
+    def test_self_solve_grad_singular(self):
+        # a rank-deficient X stays singular after stacking the gradients, and
+        # the normal equations have no unique solution
+        samples = Labels(["samples"], np.array([[0], [2]], dtype=np.int32))
+        grad_samples = Labels(
+            ["sample", "positions"], np.array([[0, 1], [1, 1]], dtype=np.int32)
+        )
+        properties = Labels(["properties"], np.array([[0], [1]], dtype=np.int32))
+        y_properties = Labels(["properties"], np.array([[0]], dtype=np.int32))
+
+        block_X = TensorBlock(
+            values=np.array([[1.0, -1.0], [1.0, -1.0]]),
+            samples=samples,
+            components=[],
+            properties=properties,
+        )
+        block_X.add_gradient(
+            "positions", np.array([[1.0, -1.0], [1.0, -1.0]]), grad_samples, []
+        )
+
+        block_Y = TensorBlock(
+            values=np.array([[1.0], [2.0]]),
+            samples=samples,
+            components=[],
+            properties=y_properties,
+        )
+        block_Y.add_gradient("positions", np.array([[3.0], [4.0]]), grad_samples, [])
+
+        keys = Labels(names=["key_1"], values=np.array([[0]], dtype=np.int32))
+        X = TensorMap(keys, [block_X])
+        Y = TensorMap(keys, [block_Y])
+
+        with self.assertRaises(np.linalg.LinAlgError):
+            equistore.solve(X, Y)
+
 
 # TODO: add tests with torch & torch scripting/tracing
 